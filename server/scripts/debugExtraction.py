@@ -1,33 +1,48 @@
 import re
 from pathlib import Path
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+BODY_TAG_PATTERN = re.compile(rb'<body[\s/>]', re.IGNORECASE)
 
 file_path = Path(r'C:\Users\justin\Desktop\IT Software\Custom Programs\NIST Tool\uploads\Ford 2024 High Availability (ROC) Survey\Section P.htm')
 section_id = 'P'
 
-with open(file_path, 'r', encoding='utf-8') as f:
-    html = f.read()
+q_pattern = re.compile(rf'{re.escape(section_id)}\.([\dA-Z.]+)')
 
-soup = BeautifulSoup(html, 'html.parser')
+# Hand the raw bytes to the parser so it does the only decode
+html = file_path.read_bytes()
+
+# Only the body text is scanned, so skip building the <head> subtree.
+# html.parser does not infer a <body>, so it can only strain pages that have one
+if HTML_PARSER == 'lxml' or BODY_TAG_PATTERN.search(html):
+    body_strainer = SoupStrainer('body')
+else:
+    body_strainer = None
+soup = BeautifulSoup(html, HTML_PARSER, parse_only=body_strainer, from_encoding='utf-8')
 text = soup.get_text()
-lines = [l.strip() for l in text.split('\n') if l.strip()]
+lines = [line for line in map(str.strip, text.split('\n')) if line]
 
 print(f"Looking for pattern: {section_id}.[\dA-Z.]+")
 print(f"\nScanning {len(lines)} lines...\n")
 
 for i, line in enumerate(lines[:50]):
-    if re.search(rf'{section_id}\.[\dA-Z.]+', line):
+    q_match = q_pattern.search(line)
+    if q_match:
         print(f"MATCH at line {i}: {line[:150]}")
-        q_match = re.search(rf'{section_id}\.([\dA-Z.]+)', line)
-        if q_match:
-            q_num = q_match.group(1)
-            question_id = f"{section_id}.{q_num}"
-            print(f"  Extracted q_num: {repr(q_num)}")
-            print(f"  Final question_id: {question_id}")
-
-            # Check selected answer extraction
-            answer_match = re.search(rf'{section_id}\.{re.escape(q_num)}\s+(.+?)(?:Answered by:|$)', line)
-            if answer_match:
-                potential_answer = answer_match.group(1).strip()
-                print(f"  Potential answer: {potential_answer[:100]}")
-            print()
+        q_num = q_match.group(1)
+        question_id = f"{section_id}.{q_num}"
+        print(f"  Extracted q_num: {repr(q_num)}")
+        print(f"  Final question_id: {question_id}")
+
+        # Check selected answer extraction
+        answer_match = re.search(rf'{re.escape(section_id)}\.{re.escape(q_num)}\s+(.+?)(?:Answered by:|$)', line)
+        if answer_match:
+            potential_answer = answer_match.group(1).strip()
+            print(f"  Potential answer: {potential_answer[:100]}")
+        print()
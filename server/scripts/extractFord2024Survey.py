@@ -1,30 +1,202 @@
+import argparse
 import json
 import re
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from html.parser import HTMLParser
+from operator import itemgetter
 from pathlib import Path
-from bs4 import BeautifulSoup
-from datetime import datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 UPLOAD_DIR = Path(r'C:\Users\justin\Desktop\IT Software\Custom Programs\NIST Tool\uploads\Ford 2024 High Availability (ROC) Survey')
 OUTPUT_FILE = Path(__file__).parent.parent / 'data' / 'ford-survey-2024-real.json'
 
+# Section files to extract, with the section each one belongs to
+SECTIONS_TO_EXTRACT = (
+    ('Section A.htm', 'A'),
+    ('Section B.htm', 'B'),
+    ('Section C.htm', 'C'),
+    ('Section D.htm', 'D'),
+    ('Section E.htm', 'E'),
+    ('Section F.htm', 'F'),
+    ('Section G.htm', 'G'),
+    ('Section H.htm', 'H'),
+    ('Section I.htm', 'I'),
+    ('Section J.htm', 'J'),
+    ('Section K.htm', 'K'),
+    ('Section M.htm', 'M'),
+    ('Section N.htm', 'N'),
+    ('Section N (PAGE 2).htm', 'N'),
+    ('Section P.htm', 'P'),
+    ('Section R.htm', 'R'),
+    ('Section T.htm', 'T'),
+    ('Section U.htm', 'U'),
+    ('Section V.htm', 'V'),
+)
+
+TITLE_PATTERN = re.compile(r'Section ([A-Z]):\s*(.+?)\s*-\s*\((.+?)\)')
+TITLE_DASH_PATTERN = re.compile(r'Section ([A-Z])\s*-\s*(.+?)\s*-\s*\((.+?)\)')
+ANSWERED_BY_PATTERN = re.compile(r'Answered by:\s*([A-Za-z\s]+?)(?:Date:|$)')
+DATE_PATTERN = re.compile(r'Date:\s*(\d{2}/\d{2}/\d{4})')
+SCORE_PATTERN = re.compile(r'Likelihood:\s*(\d+),\s*Overall impact:\s*(\d+)')
+YES_OPTION_PATTERN = re.compile(r'(Yes,[^N]+?)(?=No,|Not applicable|Show possible)')
+NO_OPTION_PATTERN = re.compile(r'(No,[^N]+?)(?=Not applicable|Show possible|Comments)')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Lines that end a multi-line question block
+QUESTION_STOP_PREFIXES = ('Data Location:', 'Create a new task')
+# Text after a question ID that is the question itself, not a selected answer
+QUESTION_TEXT_PREFIXES = ('Is there', 'Does', 'Has', 'Have', 'Are', 'Do', 'Will')
+# Metadata lines that are never part of the question text
+QUESTION_TEXT_SKIP_PREFIXES = ('Data Location', 'Comments', 'Likelihood')
+# Lines that end a continued Yes/No option
+YES_OPTION_STOP_PREFIXES = ('No,', 'Not applicable', 'Show possible', 'Comments')
+NO_OPTION_STOP_PREFIXES = ('Yes,', 'Not applicable', 'Show possible', 'Comments')
+# Lines following 'Comments' that mean no comment was entered
+COMMENT_STOP_PREFIXES = ('Data Location', 'Likelihood')
+
+class SectionTextParser(HTMLParser):
+    """Stream a Section page, collecting the <h1> title and the body text"""
+
+    # Text inside these tags is never part of the page text
+    SKIPPED_TAGS = ('head', 'script', 'style', 'template')
+    # Whitespace inside these tags is kept exactly as written
+    PRESERVE_WHITESPACE_TAGS = ('pre', 'textarea')
+    # Tags that never hold content, so they are never left open
+    VOID_TAGS = frozenset({'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command',
+                           'embed', 'frame', 'hr', 'image', 'img', 'input', 'isindex',
+                           'keygen', 'link', 'menuitem', 'meta', 'nextid', 'param',
+                           'source', 'spacer', 'track', 'wbr'})
+    ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title_parts = []
+        self.text_parts = []
+        self._pending = []
+        # Open tags, closed the way BeautifulSoup does: an end tag closes
+        # everything opened after the matching start tag
+        self._open = []
+        # Void tags opened without '/>'; a stray end tag for one is ignored
+        self._closed_voids = []
+        self._skip_depth = 0
+        self._preserve_depth = 0
+        self._title_level = None
+        self._in_title = False
+
+    def _flush(self):
+        # html.parser may hand one text node over in several chunks; join them
+        # and collapse whitespace-only nodes to ' ' or '\n' as BeautifulSoup does
+        if not self._pending:
+            return
+        text = ''.join(self._pending)
+        self._pending.clear()
+        if not self._preserve_depth and not text.strip(self.ASCII_SPACES):
+            text = '\n' if '\n' in text else ' '
+        self.text_parts.append(text)
+        if self._in_title:
+            self.title_parts.append(text.strip())
+
+    def _pop_to(self, tag):
+        if tag not in self._open:
+            return
+        while True:
+            closed = self._open.pop()
+            if closed in self.SKIPPED_TAGS:
+                self._skip_depth -= 1
+            elif closed in self.PRESERVE_WHITESPACE_TAGS:
+                self._preserve_depth -= 1
+            if closed == tag:
+                break
+        if self._in_title and len(self._open) <= self._title_level:
+            self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag == 'body':
+            # <body> implicitly closes an unterminated <head>
+            self._pop_to('head')
+        if tag in self.VOID_TAGS:
+            self._closed_voids.append(tag)
+            return
+        if tag == 'h1' and self._title_level is None:
+            # Only the first heading (with anything nested in it) is the section title
+            self._title_level = len(self._open)
+            self._in_title = True
+        elif tag in self.SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in self.PRESERVE_WHITESPACE_TAGS:
+            self._preserve_depth += 1
+        self._open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # Self-closing tags carry no text and must not open a skipped region
+        self._flush()
+        if tag == 'h1' and self._title_level is None:
+            # An empty <h1/> is still the first heading, leaving the title blank
+            self._title_level = len(self._open)
+
+    def handle_endtag(self, tag):
+        if tag in self._closed_voids:
+            # e.g. the </br> after <br>: not a boundary, the text node continues
+            self._closed_voids.remove(tag)
+            return
+        self._flush()
+        self._pop_to(tag)
+
+    def handle_data(self, data):
+        if data and not self._skip_depth:
+            self._pending.append(data)
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        # CDATA sections are page text of their own, like any other text node
+        if data.upper().startswith('CDATA[') and not self._skip_depth:
+            self._pending.append(data[len('CDATA['):])
+            self._flush()
+
+    def close(self):
+        super().close()
+        self._flush()
+
+def read_section_text(html):
+    """Return the (title, body text) of a Section page in a single parse"""
+    parser = SectionTextParser()
+    parser.feed(html)
+    parser.close()
+    return ''.join(parser.title_parts), ''.join(parser.text_parts)
+
+@lru_cache(maxsize=None)
+def question_id_pattern(section_id):
+    """Question ID pattern (A.1, U.2F, N.13.1F, ...) for a section, compiled once per letter"""
+    return re.compile(rf'{re.escape(section_id)}\.([\dA-Z.]+)')
+
 def extract_questions_from_section(file_path, section_id):
     """Extract questions with scoring data"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            html = f.read()
-
-        soup = BeautifulSoup(html, 'html.parser')
-        text = soup.get_text()
-        lines = [l.strip() for l in text.split('\n') if l.strip()]
+        html = Path(file_path).read_text(encoding='utf-8')
 
-        # Get section title
-        h1 = soup.find('h1')
-        title_text = h1.get_text(strip=True) if h1 else ""
+        title_text, text = read_section_text(html)
+        lines = [line for line in map(str.strip, text.split('\n')) if line]
 
         # Parse title
-        match = re.search(r'Section ([A-Z]):\s*(.+?)\s*-\s*\((.+?)\)', title_text)
+        match = TITLE_PATTERN.search(title_text)
         if not match:
-            match = re.search(r'Section ([A-Z])\s*-\s*(.+?)\s*-\s*\((.+?)\)', title_text)
+            match = TITLE_DASH_PATTERN.search(title_text)
 
         if match:
             section_name = match.group(2).strip()
@@ -33,237 +205,247 @@ def extract_questions_from_section(file_path, section_id):
             section_name = "Unknown"
             risk_level = None
 
+        q_id_pattern = question_id_pattern(section_id)
+        # Classify every line in a single pass: question lines and scoring lines
+        # are the only ones the walk below has to find by position. The cheap
+        # substring checks rule out most lines before any regex runs.
+        q_prefix = f'{section_id}.'
+        question_matches = {}
+        score_matches = {}
+        for idx, line in enumerate(lines):
+            if q_prefix in line:
+                match = q_id_pattern.search(line)
+                if match:
+                    question_matches[idx] = match
+            if 'Likelihood:' in line and 'impact:' in line:
+                match = SCORE_PATTERN.search(line)
+                if match:
+                    score_matches[idx] = match
+        # Each question bisects into the scoring lines
+        score_indices = list(score_matches)
+
         questions = []
-        i = 0
+        # Only question lines can start a question; any question line that the
+        # previous question's look-ahead already consumed is skipped
+        next_index = 0
 
-        while i < len(lines):
+        for i, q_match in question_matches.items():
+            if i < next_index:
+                continue
             line = lines[i]
 
-            # Look for question pattern with scoring
-            # Updated regex to handle alphanumeric IDs like U.2F, N.13.1F, etc.
-            if re.search(rf'{section_id}\.[\dA-Z.]+', line):
-                q_match = re.search(rf'{section_id}\.([\dA-Z.]+)', line)
-                if q_match:
-                    q_num = q_match.group(1)
-                    question_id = f"{section_id}.{q_num}"
-
-                    # Extract selected answer from the same line (appears after question ID)
-                    # Pattern: "A.1 Selected answer text here..." or "U.2F Selected answer..."
-                    selected_option = None
-                    answer_match = re.search(rf'{section_id}\.{re.escape(q_num)}\s+(.+?)(?:Answered by:|$)', line)
-                    if answer_match:
-                        potential_answer = answer_match.group(1).strip()
-                        # Only use if it's not just the question text starting
-                        if not potential_answer.startswith(('Is there', 'Does', 'Has', 'Have', 'Are', 'Do', 'Will')):
-                            selected_option = potential_answer
-
-                    # Extract metadata from this line
-                    answered_by = None
-                    answered_date = None
-                    likelihood = None
-                    overall_impact = None
-
-                    if 'Answered by:' in line:
-                        ans_match = re.search(r'Answered by:\s*([A-Za-z\s]+?)(?:Date:|$)', line)
-                        if ans_match:
-                            answered_by = ans_match.group(1).strip()
-
-                    if 'Date:' in line:
-                        date_match = re.search(r'Date:\s*(\d{2}/\d{2}/\d{4})', line)
-                        if date_match:
-                            answered_date = date_match.group(1)
-
-                    # Look ahead for scoring (usually near the end of question)
-                    scoring_search_range = min(i + 50, len(lines))
-                    for j in range(i, scoring_search_range):
-                        score_line = lines[j]
-                        if 'Likelihood:' in score_line and 'impact:' in score_line:
-                            score_match = re.search(r'Likelihood:\s*(\d+),\s*Overall impact:\s*(\d+)', score_line)
-                            if score_match:
-                                likelihood = int(score_match.group(1))
-                                overall_impact = int(score_match.group(2))
+            q_num = q_match.group(1)
+            question_id = f"{section_id}.{q_num}"
+
+            # Extract selected answer from the same line (appears after question ID)
+            # Pattern: "A.1 Selected answer text here..." or "U.2F Selected answer..."
+            selected_option = None
+            answer_match = re.search(rf'{section_id}\.{re.escape(q_num)}\s+(.+?)(?:Answered by:|$)', line)
+            if answer_match:
+                potential_answer = answer_match.group(1).strip()
+                # Only use if it's not just the question text starting
+                if not potential_answer.startswith(QUESTION_TEXT_PREFIXES):
+                    selected_option = potential_answer
+
+            # Extract metadata from this line
+            answered_by = None
+            answered_date = None
+            likelihood = None
+            overall_impact = None
+
+            if 'Answered by:' in line:
+                ans_match = ANSWERED_BY_PATTERN.search(line)
+                if ans_match:
+                    answered_by = ans_match.group(1).strip()
+
+            if 'Date:' in line:
+                date_match = DATE_PATTERN.search(line)
+                if date_match:
+                    answered_date = date_match.group(1)
+
+            # Look ahead for scoring (usually near the end of question)
+            k = bisect_left(score_indices, i)
+            if k < len(score_indices) and score_indices[k] < i + 50:
+                score_match = score_matches[score_indices[k]]
+                likelihood = int(score_match.group(1))
+                overall_impact = int(score_match.group(2))
+
+            # Look for question text - check current line first (single-line format)
+            question_parts = []
+            help_text = None
+            # Insertion-ordered set: dict keys keep option order and dedup in O(1)
+            options = {}
+            comments = None
+            # selected_option already extracted above from the question ID line
+
+            # Check if question text is on the SAME line (single-line format)
+            # Pattern: "P.4F [answer] Answered by: X Date: Y 1. P.4F [question text]"
+            same_line_q_match = re.search(rf'\d+\.\s+{section_id}\.{re.escape(q_num)}\s+(.+?)(?:Help Text|$)', line)
+            if same_line_q_match:
+                # Single-line format - extract everything from current line
+                question_text = same_line_q_match.group(1).strip()
+                # Extract help text from same line
+                if 'Help Text' in line:
+                    help_parts = line.split('Help Text', 1)
+                    if len(help_parts) > 1:
+                        remaining = help_parts[1]
+                        if 'Please select' in remaining:
+                            help_text = remaining.split('Please select')[0].strip()
+                # Extract options from same line
+                if 'Yes,' in line:
+                    yes_match = YES_OPTION_PATTERN.search(line)
+                    if yes_match:
+                        options[yes_match.group(1).strip()] = None
+                if 'No,' in line:
+                    no_match = NO_OPTION_PATTERN.search(line)
+                    if no_match:
+                        options[no_match.group(1).strip()] = None
+                if 'Not applicable' in line:
+                    options['Not applicable'] = None
+
+                # Add the question to the list
+                if question_text:
+                    questions.append({
+                        'questionId': question_id,
+                        'questionText': question_text,
+                        'helpText': help_text,
+                        'answerType': 'single-choice',
+                        'options': list(options),
+                        'scoring': {
+                            'likelihood': likelihood,
+                            'overallImpact': overall_impact
+                        },
+                        'givenAnswer': {
+                            'selectedOption': selected_option,
+                            'comments': comments,
+                            'answeredBy': answered_by,
+                            'answeredDate': answered_date
+                        }
+                    })
+
+                continue  # Skip to next question
+
+            # Multi-line format - look at subsequent lines
+            j = i + 1
+            collecting_question = True
+            collecting_options = False
+            collecting_comments = False
+
+            while j < len(lines) and j < i + 40:
+                next_line = lines[j]
+
+                # Stop if we hit another question
+                if j > i + 2 and j in question_matches:
+                    break
+
+                # Stop at certain markers
+                if next_line.startswith(QUESTION_STOP_PREFIXES):
+                    break
+
+                # Extract question text
+                if collecting_question:
+                    if 'Help Text' in next_line:
+                        parts = next_line.split('Help Text')
+                        if parts[0].strip():
+                            question_parts.append(parts[0].strip())
+                        collecting_question = False
+                        if len(parts) > 1 and parts[1].strip():
+                            remaining = parts[1].strip()
+                            if not remaining.startswith('Please select'):
+                                help_text = remaining.split('Please select')[0].strip() if 'Please select' in remaining else remaining
+                        j += 1
+                        continue
+
+                    if 'Please select' in next_line:
+                        parts = next_line.split('Please select')
+                        if parts[0].strip():
+                            question_parts.append(parts[0].strip())
+                        collecting_question = False
+                        collecting_options = True
+                        j += 1
+                        continue
+
+                    # Collect question text
+                    if next_line and not next_line.startswith(QUESTION_TEXT_SKIP_PREFIXES):
+                        question_parts.append(next_line)
+                        if '?' in next_line:
+                            collecting_question = False
+
+                # Collect options
+                if collecting_options or 'Please select' in next_line:
+                    collecting_options = True
+
+                    # Common option patterns
+                    if next_line.startswith('Yes,'):
+                        # Extract full Yes option
+                        yes_parts = [next_line]
+                        # Look ahead for continuation
+                        k = j + 1
+                        while k < len(lines) and not lines[k].startswith(YES_OPTION_STOP_PREFIXES):
+                            if lines[k] and k not in question_matches:
+                                yes_parts.append(lines[k])
+                                k += 1
+                            else:
+                                break
+                        yes_opt = ' '.join(yes_parts)
+                        options[yes_opt] = None
+                        j = k - 1
+
+                    elif next_line.startswith('No,'):
+                        # Extract full No option
+                        no_parts = [next_line]
+                        k = j + 1
+                        while k < len(lines) and not lines[k].startswith(NO_OPTION_STOP_PREFIXES):
+                            if lines[k] and k not in question_matches:
+                                no_parts.append(lines[k])
+                                k += 1
+                            else:
                                 break
+                        no_opt = ' '.join(no_parts)
+                        options[no_opt] = None
+                        j = k - 1
 
-                    # Look for question text - check current line first (single-line format)
-                    question_text = ""
-                    help_text = None
-                    options = []
-                    comments = None
-                    # selected_option already extracted above from the question ID line
-
-                    # Check if question text is on the SAME line (single-line format)
-                    # Pattern: "P.4F [answer] Answered by: X Date: Y 1. P.4F [question text]"
-                    same_line_q_match = re.search(rf'\d+\.\s+{section_id}\.{re.escape(q_num)}\s+(.+?)(?:Help Text|$)', line)
-                    if same_line_q_match:
-                        # Single-line format - extract everything from current line
-                        question_text = same_line_q_match.group(1).strip()
-                        # Extract help text from same line
-                        if 'Help Text' in line:
-                            help_parts = line.split('Help Text', 1)
-                            if len(help_parts) > 1:
-                                remaining = help_parts[1]
-                                if 'Please select' in remaining:
-                                    help_text = remaining.split('Please select')[0].strip()
-                        # Extract options from same line
-                        if 'Yes,' in line:
-                            yes_match = re.search(r'(Yes,[^N]+?)(?=No,|Not applicable|Show possible)', line)
-                            if yes_match:
-                                options.append(yes_match.group(1).strip())
-                        if 'No,' in line:
-                            no_match = re.search(r'(No,[^N]+?)(?=Not applicable|Show possible|Comments)', line)
-                            if no_match:
-                                options.append(no_match.group(1).strip())
-                        if 'Not applicable' in line:
-                            options.append('Not applicable')
-
-                        # Add the question to the list
-                        if question_text:
-                            questions.append({
-                                'questionId': question_id,
-                                'questionText': question_text,
-                                'helpText': help_text,
-                                'answerType': 'single-choice',
-                                'options': options if options else [],
-                                'scoring': {
-                                    'likelihood': likelihood,
-                                    'overallImpact': overall_impact
-                                },
-                                'givenAnswer': {
-                                    'selectedOption': selected_option,
-                                    'comments': comments,
-                                    'answeredBy': answered_by,
-                                    'answeredDate': answered_date
-                                }
-                            })
-
-                        i += 1
-                        continue  # Skip to next question
-
-                    # Multi-line format - look at subsequent lines
-                    j = i + 1
-                    collecting_question = True
-                    collecting_options = False
-                    collecting_comments = False
-
-                    while j < len(lines) and j < i + 40:
-                        next_line = lines[j]
-
-                        # Stop if we hit another question
-                        if re.search(rf'{section_id}\.[\dA-Z.]+', next_line) and j > i + 2:
-                            break
-
-                        # Stop at certain markers
-                        if next_line.startswith('Data Location:') or next_line.startswith('Create a new task'):
-                            break
-
-                        # Extract question text
-                        if collecting_question:
-                            if 'Help Text' in next_line:
-                                parts = next_line.split('Help Text')
-                                if parts[0].strip():
-                                    question_text += ' ' + parts[0].strip()
-                                collecting_question = False
-                                if len(parts) > 1 and parts[1].strip():
-                                    remaining = parts[1].strip()
-                                    if not remaining.startswith('Please select'):
-                                        help_text = remaining.split('Please select')[0].strip() if 'Please select' in remaining else remaining
-                                j += 1
-                                continue
-
-                            if 'Please select' in next_line:
-                                parts = next_line.split('Please select')
-                                if parts[0].strip():
-                                    question_text += ' ' + parts[0].strip()
-                                collecting_question = False
-                                collecting_options = True
-                                j += 1
-                                continue
-
-                            # Collect question text
-                            if next_line and not next_line.startswith(('Data Location', 'Comments', 'Likelihood')):
-                                question_text += ' ' + next_line
-                                if '?' in next_line:
-                                    collecting_question = False
-
-                        # Collect options
-                        if collecting_options or 'Please select' in next_line:
-                            collecting_options = True
-
-                            # Common option patterns
-                            if next_line.startswith('Yes,'):
-                                # Extract full Yes option
-                                yes_opt = next_line
-                                # Look ahead for continuation
-                                k = j + 1
-                                while k < len(lines) and not lines[k].startswith(('No,', 'Not applicable', 'Show possible', 'Comments')):
-                                    if lines[k] and not re.search(rf'{section_id}\.[\dA-Z.]+', lines[k]):
-                                        yes_opt += ' ' + lines[k]
-                                        k += 1
-                                    else:
-                                        break
-                                if yes_opt not in options:
-                                    options.append(yes_opt.strip())
-                                j = k - 1
-
-                            elif next_line.startswith('No,'):
-                                # Extract full No option
-                                no_opt = next_line
-                                k = j + 1
-                                while k < len(lines) and not lines[k].startswith(('Yes,', 'Not applicable', 'Show possible', 'Comments')):
-                                    if lines[k] and not re.search(rf'{section_id}\.[\dA-Z.]+', lines[k]):
-                                        no_opt += ' ' + lines[k]
-                                        k += 1
-                                    else:
-                                        break
-                                if no_opt not in options:
-                                    options.append(no_opt.strip())
-                                j = k - 1
-
-                            elif next_line == 'Not applicable' and 'Not applicable' not in options:
-                                options.append('Not applicable')
-
-                            if 'Show possible answers' in next_line or next_line == 'Comments':
-                                collecting_options = False
-                                if next_line == 'Comments':
-                                    collecting_comments = True
-
-                        # Collect comments
+                    elif next_line == 'Not applicable':
+                        options['Not applicable'] = None
+
+                    if 'Show possible answers' in next_line or next_line == 'Comments':
+                        collecting_options = False
                         if next_line == 'Comments':
                             collecting_comments = True
-                            j += 1
-                            if j < len(lines) and not lines[j].startswith(('Data Location', 'Likelihood')):
-                                comments = lines[j]
-                            continue
-
-                        j += 1
 
-                    # Clean up question text
-                    question_text = question_text.strip()
-                    question_text = re.sub(r'\s+', ' ', question_text)
-
-                    if question_text and not question_text.startswith('Data Location'):
-                        questions.append({
-                            'questionId': question_id,
-                            'questionText': question_text,
-                            'helpText': help_text,
-                            'answerType': 'single-choice',
-                            'options': options if options else [],
-                            'scoring': {
-                                'likelihood': likelihood,
-                                'overallImpact': overall_impact
-                            },
-                            'givenAnswer': {
-                                'selectedOption': selected_option,
-                                'comments': comments,
-                                'answeredBy': answered_by,
-                                'answeredDate': answered_date
-                            }
-                        })
-
-                    i = j
+                # Collect comments
+                if next_line == 'Comments':
+                    collecting_comments = True
+                    j += 1
+                    if j < len(lines) and not lines[j].startswith(COMMENT_STOP_PREFIXES):
+                        comments = lines[j]
                     continue
 
-            i += 1
+                j += 1
+
+            # Clean up question text
+            question_text = WHITESPACE_PATTERN.sub(' ', ' '.join(question_parts)).strip()
+
+            if question_text and not question_text.startswith('Data Location'):
+                questions.append({
+                    'questionId': question_id,
+                    'questionText': question_text,
+                    'helpText': help_text,
+                    'answerType': 'single-choice',
+                    'options': list(options),
+                    'scoring': {
+                        'likelihood': likelihood,
+                        'overallImpact': overall_impact
+                    },
+                    'givenAnswer': {
+                        'selectedOption': selected_option,
+                        'comments': comments,
+                        'answeredBy': answered_by,
+                        'answeredDate': answered_date
+                    }
+                })
+
+            next_index = j
 
         return {
             'sectionId': section_id,
@@ -278,51 +460,56 @@ def extract_questions_from_section(file_path, section_id):
         traceback.print_exc()
         return None
 
+def write_survey(survey, compact=False):
+    """Write the survey JSON, using orjson when it is installed"""
+    if orjson is not None:
+        option = 0 if compact else orjson.OPT_INDENT_2
+        OUTPUT_FILE.write_bytes(orjson.dumps(survey, option=option))
+        return
+
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        if compact:
+            json.dump(survey, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump(survey, f, indent=2, ensure_ascii=False)
+
 def main():
-    print("Extracting Ford 2024 High Availability Survey...\n")
+    parser = argparse.ArgumentParser(description='Extract the Ford 2024 High Availability survey sections to JSON')
+    parser.add_argument('--compact', action='store_true',
+                        help='write compact JSON instead of indenting it')
+    args = parser.parse_args()
 
-    sections_to_extract = [
-        ('Section A.htm', 'A'),
-        ('Section B.htm', 'B'),
-        ('Section C.htm', 'C'),
-        ('Section D.htm', 'D'),
-        ('Section E.htm', 'E'),
-        ('Section F.htm', 'F'),
-        ('Section G.htm', 'G'),
-        ('Section H.htm', 'H'),
-        ('Section I.htm', 'I'),
-        ('Section J.htm', 'J'),
-        ('Section K.htm', 'K'),
-        ('Section M.htm', 'M'),
-        ('Section N.htm', 'N'),
-        ('Section N (PAGE 2).htm', 'N'),
-        ('Section P.htm', 'P'),
-        ('Section R.htm', 'R'),
-        ('Section T.htm', 'T'),
-        ('Section U.htm', 'U'),
-        ('Section V.htm', 'V'),
-    ]
+    print("Extracting Ford 2024 High Availability Survey...\n")
 
     all_sections = {}
 
-    for filename, section_id in sections_to_extract:
+    pending = []
+    for filename, section_id in SECTIONS_TO_EXTRACT:
         file_path = UPLOAD_DIR / filename
         if not file_path.exists():
             print(f"File not found: {filename}")
             continue
+        pending.append((filename, section_id, file_path))
 
-        print(f"Processing {filename}...")
-        section_data = extract_questions_from_section(file_path, section_id)
+    # Sections are independent and CPU-bound, so parse them across processes.
+    # map() yields results in schedule order, which keeps multi-page merges stable.
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(extract_questions_from_section,
+                               [file_path for _, _, file_path in pending],
+                               [section_id for _, section_id, _ in pending])
 
-        if section_data:
-            if section_id in all_sections:
-                all_sections[section_id]['questions'].extend(section_data['questions'])
-                print(f"  Added {len(section_data['questions'])} more questions to Section {section_id}")
-            else:
-                all_sections[section_id] = section_data
-                print(f"  Extracted {len(section_data['questions'])} questions")
+        for (filename, section_id, _), section_data in zip(pending, results):
+            print(f"Processing {filename}...")
 
-    sections_list = sorted(all_sections.values(), key=lambda x: x['sectionId'])
+            if section_data:
+                if section_id in all_sections:
+                    all_sections[section_id]['questions'].extend(section_data['questions'])
+                    print(f"  Added {len(section_data['questions'])} more questions to Section {section_id}")
+                else:
+                    all_sections[section_id] = section_data
+                    print(f"  Extracted {len(section_data['questions'])} questions")
+
+    sections_list = sorted(all_sections.values(), key=itemgetter('sectionId'))
 
     survey = {
         'surveyId': 'ford-sig-lite-2024-high-availability',
@@ -334,8 +521,7 @@ def main():
 
     OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(survey, f, indent=2, ensure_ascii=False)
+    write_survey(survey, compact=args.compact)
 
     total_questions = sum(len(s['questions']) for s in sections_list)
     scored_questions = sum(1 for s in sections_list for q in s['questions']
@@ -1,30 +1,184 @@
+import argparse
 import json
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from html.parser import HTMLParser
+from operator import itemgetter
 from pathlib import Path
-from bs4 import BeautifulSoup
-from datetime import datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 UPLOAD_DIR = Path(__file__).parent.parent.parent / 'uploads'
 OUTPUT_FILE = Path(__file__).parent.parent / 'data' / 'ford-survey-real.json'
 
+# Section files to extract, with the section each one belongs to
+SECTIONS_TO_EXTRACT = (
+    ('Section A.htm', 'A'),
+    ('Section B.htm', 'B'),
+    ('Section C.htm', 'C'),
+    ('Section D.htm', 'D'),
+    ('Section E.htm', 'E'),
+    ('Section F.htm', 'F'),
+    ('Section G.htm', 'G'),
+    ('Section H.htm', 'H'),
+    ('Section I.htm', 'I'),
+    ('Section J.htm', 'J'),
+    ('Section K.htm', 'K'),
+    ('Section N.htm', 'N'),
+    ('Section N (page 2).htm', 'N'),  # Page 2 of N
+    ('Section T.htm', 'T'),
+    ('Section V.htm', 'V'),
+)
+
+TITLE_PATTERN = re.compile(r'Section ([A-Z]):\s*(.+?)\s*-\s*\((.+?)\)')
+TITLE_DASH_PATTERN = re.compile(r'Section ([A-Z])\s*-\s*(.+?)\s*-\s*\((.+?)\)')
+ANSWERED_BY_PATTERN = re.compile(r'Answered by:\s*([^\d]+)')
+DATE_PATTERN = re.compile(r'(\d{2}/\d{2}/\d{4})')
+YES_OPTION_PATTERN = re.compile(r'(Yes,[^N]+(?:requirements|program|policy|plan|controls?|procedures?|processes?))')
+NO_OPTION_PATTERN = re.compile(r'(No,[^N]+(?:requirements|program|policy|plan|controls?|procedures?|processes?))')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+class SectionTextParser(HTMLParser):
+    """Stream a Section page, collecting the <h1> title and the body text"""
+
+    # Text inside these tags is never part of the page text
+    SKIPPED_TAGS = ('head', 'script', 'style', 'template')
+    # Whitespace inside these tags is kept exactly as written
+    PRESERVE_WHITESPACE_TAGS = ('pre', 'textarea')
+    # Tags that never hold content, so they are never left open
+    VOID_TAGS = frozenset({'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command',
+                           'embed', 'frame', 'hr', 'image', 'img', 'input', 'isindex',
+                           'keygen', 'link', 'menuitem', 'meta', 'nextid', 'param',
+                           'source', 'spacer', 'track', 'wbr'})
+    ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title_parts = []
+        self.text_parts = []
+        self._pending = []
+        # Open tags, closed the way BeautifulSoup does: an end tag closes
+        # everything opened after the matching start tag
+        self._open = []
+        # Void tags opened without '/>'; a stray end tag for one is ignored
+        self._closed_voids = []
+        self._skip_depth = 0
+        self._preserve_depth = 0
+        self._title_level = None
+        self._in_title = False
+
+    def _flush(self):
+        # html.parser may hand one text node over in several chunks; join them
+        # and collapse whitespace-only nodes to ' ' or '\n' as BeautifulSoup does
+        if not self._pending:
+            return
+        text = ''.join(self._pending)
+        self._pending.clear()
+        if not self._preserve_depth and not text.strip(self.ASCII_SPACES):
+            text = '\n' if '\n' in text else ' '
+        self.text_parts.append(text)
+        if self._in_title:
+            self.title_parts.append(text.strip())
+
+    def _pop_to(self, tag):
+        if tag not in self._open:
+            return
+        while True:
+            closed = self._open.pop()
+            if closed in self.SKIPPED_TAGS:
+                self._skip_depth -= 1
+            elif closed in self.PRESERVE_WHITESPACE_TAGS:
+                self._preserve_depth -= 1
+            if closed == tag:
+                break
+        if self._in_title and len(self._open) <= self._title_level:
+            self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag == 'body':
+            # <body> implicitly closes an unterminated <head>
+            self._pop_to('head')
+        if tag in self.VOID_TAGS:
+            self._closed_voids.append(tag)
+            return
+        if tag == 'h1' and self._title_level is None:
+            # Only the first heading (with anything nested in it) is the section title
+            self._title_level = len(self._open)
+            self._in_title = True
+        elif tag in self.SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in self.PRESERVE_WHITESPACE_TAGS:
+            self._preserve_depth += 1
+        self._open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # Self-closing tags carry no text and must not open a skipped region
+        self._flush()
+        if tag == 'h1' and self._title_level is None:
+            # An empty <h1/> is still the first heading, leaving the title blank
+            self._title_level = len(self._open)
+
+    def handle_endtag(self, tag):
+        if tag in self._closed_voids:
+            # e.g. the </br> after <br>: not a boundary, the text node continues
+            self._closed_voids.remove(tag)
+            return
+        self._flush()
+        self._pop_to(tag)
+
+    def handle_data(self, data):
+        if data and not self._skip_depth:
+            self._pending.append(data)
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        # CDATA sections are page text of their own, like any other text node
+        if data.upper().startswith('CDATA[') and not self._skip_depth:
+            self._pending.append(data[len('CDATA['):])
+            self._flush()
+
+    def close(self):
+        super().close()
+        self._flush()
+
+def read_section_text(html):
+    """Return the (title, body text) of a Section page in a single parse"""
+    parser = SectionTextParser()
+    parser.feed(html)
+    parser.close()
+    return ''.join(parser.title_parts), ''.join(parser.text_parts)
+
+@lru_cache(maxsize=None)
+def question_id_pattern(section_id):
+    """Question ID pattern ("X.N" where X is the section letter), compiled once per letter"""
+    return re.compile(rf'{re.escape(section_id)}\.(\d+)')
+
 def extract_questions_from_section(file_path, section_id):
     """Manually extract questions with careful parsing"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            html = f.read()
+        html = Path(file_path).read_text(encoding='utf-8')
 
-        soup = BeautifulSoup(html, 'html.parser')
-        text = soup.get_text()
-        lines = [l.strip() for l in text.split('\n') if l.strip()]
-
-        # Get section title
-        h1 = soup.find('h1')
-        title_text = h1.get_text(strip=True) if h1 else ""
+        title_text, text = read_section_text(html)
+        lines = [line for line in map(str.strip, text.split('\n')) if line]
 
         # Parse title
-        match = re.search(r'Section ([A-Z]):\s*(.+?)\s*-\s*\((.+?)\)', title_text)
+        match = TITLE_PATTERN.search(title_text)
         if not match:
-            match = re.search(r'Section ([A-Z])\s*-\s*(.+?)\s*-\s*\((.+?)\)', title_text)
+            match = TITLE_DASH_PATTERN.search(title_text)
 
         if match:
             section_name = match.group(2).strip()
@@ -33,128 +187,128 @@ def extract_questions_from_section(file_path, section_id):
             section_name = "Unknown"
             risk_level = None
 
+        q_pattern = question_id_pattern(section_id)
+        # Find every question line in one pass; the cheap substring check rules
+        # out most lines before the regex runs
+        q_prefix = f'{section_id}.'
+        candidates = ((idx, q_pattern.search(line)) for idx, line in enumerate(lines) if q_prefix in line)
+        question_matches = {idx: match for idx, match in candidates if match}
+
         questions = []
-        i = 0
+        # Only question lines can start a question; any question line that the
+        # previous question's look-ahead already consumed is skipped
+        next_index = 0
 
-        while i < len(lines):
+        for i, q_match in question_matches.items():
+            if i < next_index:
+                continue
             line = lines[i]
 
-            # Look for question pattern: "X.N" where X is section letter
-            q_pattern = rf'{section_id}\.(\d+)'
-            if re.search(q_pattern, line):
-                # Extract question number
-                q_match = re.search(rf'{section_id}\.(\d+)', line)
-                if q_match:
-                    q_num = q_match.group(1)
-                    question_id = f"{section_id}.{q_num}"
-
-                    # Extract metadata from this line
-                    answered_by = None
-                    answered_date = None
-
-                    if 'Answered by:' in line:
-                        ans_match = re.search(r'Answered by:\s*([^\d]+)', line)
-                        if ans_match:
-                            answered_by = ans_match.group(1).strip()
-
-                    if 'Date:' in line:
-                        date_match = re.search(r'(\d{2}/\d{2}/\d{4})', line)
-                        if date_match:
-                            answered_date = date_match.group(1)
-
-                    # Look for question text in next few lines
-                    question_text = ""
-                    help_text = None
-                    options = []
-
-                    j = i + 1
-                    collecting_question = True
-                    collecting_options = False
-
-                    while j < len(lines) and j < i + 30:
-                        next_line = lines[j]
-
-                        # Stop if we hit another question
-                        if re.search(rf'{section_id}\.\d+', next_line) and j > i + 2:
-                            break
-
-                        # Check for question text ending (usually ends with ?)
-                        if collecting_question:
-                            # Remove "Help Text" if concatenated
-                            if 'Help Text' in next_line:
-                                parts = next_line.split('Help Text')
-                                if parts[0].strip():
-                                    question_text += ' ' + parts[0].strip()
-                                collecting_question = False
-                                # Check if there's help text after
-                                if len(parts) > 1 and parts[1].strip() and 'Please select' not in parts[1]:
-                                    help_text = parts[1].strip()
-                                j += 1
-                                continue
-
-                            # Check for "Please select" which ends question
-                            if 'Please select' in next_line:
-                                parts = next_line.split('Please select')
-                                if parts[0].strip():
-                                    question_text += ' ' + parts[0].strip()
-                                collecting_question = False
-                                collecting_options = True
-                                j += 1
-                                continue
-
-                            # Otherwise collect as question text
-                            if next_line and not next_line.startswith('Data Location'):
-                                question_text += ' ' + next_line
-                                if '?' in next_line:
-                                    collecting_question = False
-
-                        # Collect options
-                        if 'Please select' in next_line or collecting_options:
-                            collecting_options = True
-
-                            # Extract options that typically start with Yes/No
-                            yes_match = re.findall(r'(Yes,[^N]+(?:requirements|program|policy|plan|controls?|procedures?|processes?))', next_line)
-                            no_match = re.findall(r'(No,[^N]+(?:requirements|program|policy|plan|controls?|procedures?|processes?))', next_line)
-
-                            for opt in yes_match:
-                                if opt not in options:
-                                    options.append(opt.strip())
-                            for opt in no_match:
-                                if opt not in options:
-                                    options.append(opt.strip())
-
-                            if 'Not applicable' in next_line and 'Not applicable' not in options:
-                                options.append('Not applicable')
-
-                            if 'Show possible answers' in next_line or 'Comments' in next_line:
-                                collecting_options = False
-                                break
-
+            q_num = q_match.group(1)
+            question_id = f"{section_id}.{q_num}"
+
+            # Extract metadata from this line
+            answered_by = None
+            answered_date = None
+
+            if 'Answered by:' in line:
+                ans_match = ANSWERED_BY_PATTERN.search(line)
+                if ans_match:
+                    answered_by = ans_match.group(1).strip()
+
+            if 'Date:' in line:
+                date_match = DATE_PATTERN.search(line)
+                if date_match:
+                    answered_date = date_match.group(1)
+
+            # Look for question text in next few lines
+            question_parts = []
+            help_text = None
+            # Insertion-ordered set: dict keys keep option order and dedup in O(1)
+            options = {}
+
+            j = i + 1
+            collecting_question = True
+            collecting_options = False
+
+            while j < len(lines) and j < i + 30:
+                next_line = lines[j]
+
+                # Stop if we hit another question
+                if j > i + 2 and j in question_matches:
+                    break
+
+                # Check for question text ending (usually ends with ?)
+                if collecting_question:
+                    # Remove "Help Text" if concatenated
+                    if 'Help Text' in next_line:
+                        parts = next_line.split('Help Text')
+                        if parts[0].strip():
+                            question_parts.append(parts[0].strip())
+                        collecting_question = False
+                        # Check if there's help text after
+                        if len(parts) > 1 and parts[1].strip() and 'Please select' not in parts[1]:
+                            help_text = parts[1].strip()
                         j += 1
-
-                    # Clean up question text
-                    question_text = question_text.strip()
-                    question_text = re.sub(r'\s+', ' ', question_text)
-
-                    if question_text and not question_text.startswith('Data Location'):
-                        questions.append({
-                            'questionId': question_id,
-                            'questionText': question_text,
-                            'helpText': help_text,
-                            'answerType': 'single-choice',
-                            'options': options if options else [],
-                            'givenAnswer': {
-                                'selectedOption': None,  # We'll need to determine this separately
-                                'comments': None,
-                                'answeredBy': answered_by,
-                                'answeredDate': answered_date
-                            }
-                        })
-
-                    i = j
-                    continue
-
-            i += 1
+                        continue
+
+                    # Check for "Please select" which ends question
+                    if 'Please select' in next_line:
+                        parts = next_line.split('Please select')
+                        if parts[0].strip():
+                            question_parts.append(parts[0].strip())
+                        collecting_question = False
+                        collecting_options = True
+                        j += 1
+                        continue
+
+                    # Otherwise collect as question text
+                    if next_line and not next_line.startswith('Data Location'):
+                        question_parts.append(next_line)
+                        if '?' in next_line:
+                            collecting_question = False
+
+                # Collect options
+                if 'Please select' in next_line or collecting_options:
+                    collecting_options = True
+
+                    # Extract options that typically start with Yes/No
+                    yes_match = YES_OPTION_PATTERN.findall(next_line)
+                    no_match = NO_OPTION_PATTERN.findall(next_line)
+
+                    for opt in yes_match:
+                        options[opt.strip()] = None
+                    for opt in no_match:
+                        options[opt.strip()] = None
+
+                    if 'Not applicable' in next_line:
+                        options['Not applicable'] = None
+
+                    if 'Show possible answers' in next_line or 'Comments' in next_line:
+                        collecting_options = False
+                        break
+
+                j += 1
+
+            # Clean up question text
+            question_text = WHITESPACE_PATTERN.sub(' ', ' '.join(question_parts)).strip()
+
+            if question_text and not question_text.startswith('Data Location'):
+                questions.append({
+                    'questionId': question_id,
+                    'questionText': question_text,
+                    'helpText': help_text,
+                    'answerType': 'single-choice',
+                    'options': list(options),
+                    'givenAnswer': {
+                        'selectedOption': None,  # We'll need to determine this separately
+                        'comments': None,
+                        'answeredBy': answered_by,
+                        'answeredDate': answered_date
+                    }
+                })
+
+            next_index = j
 
         return {
             'sectionId': section_id,
@@ -169,49 +323,58 @@ def extract_questions_from_section(file_path, section_id):
         traceback.print_exc()
         return None
 
+def write_survey(survey, compact=False):
+    """Write the survey JSON, using orjson when it is installed"""
+    if orjson is not None:
+        option = 0 if compact else orjson.OPT_INDENT_2
+        OUTPUT_FILE.write_bytes(orjson.dumps(survey, option=option))
+        return
+
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        if compact:
+            json.dump(survey, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump(survey, f, indent=2, ensure_ascii=False)
+
 def main():
-    print("Manually extracting real survey questions...\n")
+    parser = argparse.ArgumentParser(description='Extract the Ford SIG Lite survey questions to JSON')
+    parser.add_argument('--compact', action='store_true',
+                        help='write compact JSON instead of indenting it')
+    args = parser.parse_args()
 
-    sections_to_extract = [
-        ('Section A.htm', 'A'),
-        ('Section B.htm', 'B'),
-        ('Section C.htm', 'C'),
-        ('Section D.htm', 'D'),
-        ('Section E.htm', 'E'),
-        ('Section F.htm', 'F'),
-        ('Section G.htm', 'G'),
-        ('Section H.htm', 'H'),
-        ('Section I.htm', 'I'),
-        ('Section J.htm', 'J'),
-        ('Section K.htm', 'K'),
-        ('Section N.htm', 'N'),
-        ('Section N (page 2).htm', 'N'),  # Page 2 of N
-        ('Section T.htm', 'T'),
-        ('Section V.htm', 'V'),
-    ]
+    print("Manually extracting real survey questions...\n")
 
     all_sections = {}
 
-    for filename, section_id in sections_to_extract:
+    pending = []
+    for filename, section_id in SECTIONS_TO_EXTRACT:
         file_path = UPLOAD_DIR / filename
         if not file_path.exists():
             print(f"File not found: {filename}")
             continue
-
-        print(f"Processing {filename}...")
-        section_data = extract_questions_from_section(file_path, section_id)
-
-        if section_data:
-            # Merge if section already exists (for multi-page sections like N)
-            if section_id in all_sections:
-                all_sections[section_id]['questions'].extend(section_data['questions'])
-                print(f"  Added {len(section_data['questions'])} more questions to Section {section_id}")
-            else:
-                all_sections[section_id] = section_data
-                print(f"  Extracted {len(section_data['questions'])} questions")
+        pending.append((filename, section_id, file_path))
+
+    # Sections are independent and CPU-bound, so parse them across processes.
+    # map() yields results in schedule order, which keeps multi-page merges stable.
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(extract_questions_from_section,
+                               [file_path for _, _, file_path in pending],
+                               [section_id for _, section_id, _ in pending])
+
+        for (filename, section_id, _), section_data in zip(pending, results):
+            print(f"Processing {filename}...")
+
+            if section_data:
+                # Merge if section already exists (for multi-page sections like N)
+                if section_id in all_sections:
+                    all_sections[section_id]['questions'].extend(section_data['questions'])
+                    print(f"  Added {len(section_data['questions'])} more questions to Section {section_id}")
+                else:
+                    all_sections[section_id] = section_data
+                    print(f"  Extracted {len(section_data['questions'])} questions")
 
     # Convert to list and sort
-    sections_list = sorted(all_sections.values(), key=lambda x: x['sectionId'])
+    sections_list = sorted(all_sections.values(), key=itemgetter('sectionId'))
 
     survey = {
         'surveyId': 'ford-sig-lite-2024',
@@ -223,8 +386,7 @@ def main():
 
     OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(survey, f, indent=2, ensure_ascii=False)
+    write_survey(survey, compact=args.compact)
 
     total_questions = sum(len(s['questions']) for s in sections_list)
     print(f"\nOK Successfully extracted {len(sections_list)} sections")
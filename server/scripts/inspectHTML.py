@@ -1,23 +1,40 @@
-from bs4 import BeautifulSoup
+import re
+from bs4 import BeautifulSoup, SoupStrainer
 from pathlib import Path
 
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+BODY_TAG_PATTERN = re.compile(rb'<body[\s/>]', re.IGNORECASE)
+
 html_file = Path(r'C:\Users\justin\Desktop\IT Software\Custom Programs\NIST Tool\uploads\Ford 2024 High Availability (ROC) Survey\Section A.htm')
 
-with open(html_file, 'r', encoding='utf-8') as f:
-    html = f.read()
+# Hand the raw bytes to the parser so it does the only decode
+html = html_file.read_bytes()
 
-soup = BeautifulSoup(html, 'html.parser')
+# Inputs and the answer text both live in <body>; skip the <head> subtree.
+# html.parser does not infer a <body>, so it can only strain pages that have one
+if HTML_PARSER == 'lxml' or BODY_TAG_PATTERN.search(html):
+    body_strainer = SoupStrainer('body')
+else:
+    body_strainer = None
+soup = BeautifulSoup(html, HTML_PARSER, parse_only=body_strainer, from_encoding='utf-8')
+
+# Walk the tree once for all inputs, then filter the list
+all_inputs = soup.find_all('input')
 
 # Look for checked inputs
-checked_inputs = soup.find_all('input', checked=True)
+checked_inputs = [i for i in all_inputs if i.has_attr('checked')]
 print(f'Checked inputs: {len(checked_inputs)}')
 
 # Look for all inputs
-all_inputs = soup.find_all('input')
 print(f'Total inputs: {len(all_inputs)}')
 
 # Sample some radio buttons
-radios = soup.find_all('input', {'type': 'radio'})
+radios = [i for i in all_inputs if i.get('type') == 'radio']
 print(f'\nRadio buttons: {len(radios)}')
 if radios:
     print('\nFirst 3 radio buttons:')
@@ -26,7 +43,7 @@ if radios:
 
 # Look for selected answers in text
 text = soup.get_text()
-lines = [l.strip() for l in text.split('\n') if l.strip()]
+lines = [line for line in map(str.strip, text.split('\n')) if line]
 
 # Find lines with checkmarks or answer indicators
 for i, line in enumerate(lines[:100]):
@@ -1,64 +1,56 @@
-import json
-import os
 import re
-from pathlib import Path
-from bs4 import BeautifulSoup
-from datetime import datetime
 
-# Configuration
-UPLOAD_DIR = Path(__file__).parent.parent.parent / 'uploads'
-OUTPUT_FILE = Path(__file__).parent.parent / 'data' / 'ford-survey-parsed.json'
-
-# Section files to parse
-SECTION_FILES = [
-    'Section A.htm',
-    'Section B.htm',
-    'Section C.htm',
-    'Section D.htm',
-    'Section E.htm',
-    'Section F.htm',
-    'Section G.htm',
-    'Section H.htm',
-    'Section I.htm',
-    'Section J.htm',
-    'Section K.htm',
-    'Section N.htm',
-    'Section T.htm',
-    'Section V.htm'
-]
+from parseFordSurveyImproved import index_question_lines, read_section_text, run
+
+TITLE_PATTERN = re.compile(r'Section ([A-Z]):\s*(.+?)\s*-\s*\((.+?)\)')
+TITLE_DASH_PATTERN = re.compile(r'Section ([A-Z])\s*-\s*(.+?)\s*-\s*\((.+?)\)')
+TITLE_NO_RISK_PATTERN = re.compile(r'Section ([A-Z])[:\s-]+(.+)')
+TRAILING_PARENS_PATTERN = re.compile(r'\s*-\s*\(.+?\)\s*$')
+# Question ID on a line of its own, e.g. "A.1" or "1. A.1"; MULTILINE so one
+# scan of the joined body text finds every question line
+QUESTION_ID_PATTERN = re.compile(r'^(?:\d+\.[^\S\n]*)?([A-Z])\.(\d+)$', re.MULTILINE)
+
+# Marker lines that end each block of a question
+QUESTION_STOP_LINES = frozenset({'Help Text', 'Please select', 'Show possible answers', 'Answered by:'})
+OPTIONS_PROMPT_LINES = frozenset({'Please select', 'Show possible answers'})
+OPTIONS_END_LINES = frozenset({'Show possible answers', 'Answered by:'})
+COMMENTS_END_LINES = frozenset({'Data Location:', 'Answered by:'})
+ANSWERED_BY_PREFIX = 'Answered by:'
+DATE_PREFIX = 'Date:'
+
+# Unanswered givenAnswer; copying it is cheaper than building the literal per question
+EMPTY_GIVEN_ANSWER = {
+    'selectedOption': None,
+    'comments': None,
+    'answeredBy': None,
+    'answeredDate': None
+}
 
 def parse_html_file(file_path):
     """Parse a single HTML file and extract section data"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            html = f.read()
-
-        soup = BeautifulSoup(html, 'html.parser')
-
-        # Extract section title from h1
-        h1 = soup.find('h1')
-        if not h1:
+        # Extract section title from h1 and the body text in one streaming parse
+        title_text, body_text = read_section_text(file_path.read_bytes())
+        if title_text is None:
             print(f"  X No h1 tag found in {file_path}")
             return None
 
-        title_text = h1.get_text(strip=True)
-
         # Parse title: Try multiple patterns
         # Pattern 1: "SIG Lite 2024 - Section A: Enterprise Risk Management - (High Availability)"
         # Pattern 2: "SIG Lite 2022 Section C - Organizational Security - (Enhanced)"
 
-        match = re.search(r'Section ([A-Z]):\s*(.+?)\s*-\s*\((.+?)\)', title_text)
+        match = TITLE_PATTERN.search(title_text)
         if not match:
             # Try pattern 2: "Section X - Title - (Risk Level)"
-            match = re.search(r'Section ([A-Z])\s*-\s*(.+?)\s*-\s*\((.+?)\)', title_text)
+            match = TITLE_DASH_PATTERN.search(title_text)
         if not match:
             # Try without risk level
-            match = re.search(r'Section ([A-Z])[:\s-]+(.+)', title_text)
+            match = TITLE_NO_RISK_PATTERN.search(title_text)
             if match:
                 section_id = match.group(1)
                 section_name = match.group(2).strip()
                 # Remove trailing parens if any
-                section_name = re.sub(r'\s*-\s*\(.+?\)\s*$', '', section_name)
+                section_name = TRAILING_PARENS_PATTERN.sub('', section_name)
                 risk_level = None
             else:
                 print(f"  X Could not parse title: {title_text}")
@@ -71,9 +63,9 @@ def parse_html_file(file_path):
         # Find all questions
         questions = []
 
-        # Get all text content for parsing
-        body_text = soup.get_text(separator='\n')
-        lines = [line.strip() for line in body_text.split('\n') if line.strip()]
+        lines = [line for line in map(str.strip, body_text.split('\n')) if line]
+
+        question_id_lines = index_question_lines(QUESTION_ID_PATTERN, lines)
 
         # Parse questions from text
         current_question = None
@@ -84,7 +76,7 @@ def parse_html_file(file_path):
             line = lines[i]
 
             # Detect question ID (e.g., "A.1" or "1. A.1")
-            q_match = re.match(r'^(?:\d+\.\s*)?([A-Z])\.(\d+)$', line)
+            q_match = question_id_lines.get(i)
             if q_match:
                 # Save previous question
                 if current_question and current_question.get('questionId'):
@@ -98,12 +90,7 @@ def parse_html_file(file_path):
                     'helpText': None,
                     'answerType': 'single-choice',
                     'options': [],
-                    'givenAnswer': {
-                        'selectedOption': None,
-                        'comments': None,
-                        'answeredBy': None,
-                        'answeredDate': None
-                    }
+                    'givenAnswer': EMPTY_GIVEN_ANSWER.copy()
                 }
 
                 # Next line(s) should be question text
@@ -113,10 +100,9 @@ def parse_html_file(file_path):
                     question_lines = []
                     while i < len(lines):
                         next_line = lines[i]
-                        if (next_line in ['Help Text', 'Please select', 'Show possible answers', 'Answered by:'] or
-                            next_line.startswith('Answered by:') or
-                            next_line.startswith('Date:') or
-                            re.match(r'^(?:\d+\.\s*)?[A-Z]\.\d+$', next_line)):
+                        if (next_line in QUESTION_STOP_LINES or
+                            next_line.startswith((ANSWERED_BY_PREFIX, DATE_PREFIX)) or
+                            i in question_id_lines):
                             break
                         question_lines.append(next_line)
                         i += 1
@@ -126,7 +112,7 @@ def parse_html_file(file_path):
             # Detect help text
             if line == 'Help Text' and current_question:
                 i += 1
-                if i < len(lines) and lines[i] not in ['Please select', 'Show possible answers']:
+                if i < len(lines) and lines[i] not in OPTIONS_PROMPT_LINES:
                     current_question['helpText'] = lines[i]
                     i += 1
                 continue
@@ -139,17 +125,17 @@ def parse_html_file(file_path):
 
             # Collect options
             if collecting_options and current_question:
-                if line.startswith('Yes,') or line.startswith('No,') or line == 'Not applicable':
+                if line.startswith(('Yes,', 'No,')) or line == 'Not applicable':
                     current_question['options'].append(line)
-                elif line in ['Show possible answers', 'Answered by:'] or line.startswith('Answered by:'):
+                elif line in OPTIONS_END_LINES or line.startswith(ANSWERED_BY_PREFIX):
                     collecting_options = False
                     continue
                 i += 1
                 continue
 
             # Detect answered by
-            if line.startswith('Answered by:') and current_question:
-                answered_by = line.replace('Answered by:', '').strip()
+            if line.startswith(ANSWERED_BY_PREFIX) and current_question:
+                answered_by = line[len(ANSWERED_BY_PREFIX):].strip()
                 if not answered_by and i + 1 < len(lines):
                     i += 1
                     answered_by = lines[i].strip()
@@ -158,8 +144,8 @@ def parse_html_file(file_path):
                 continue
 
             # Detect date
-            if line.startswith('Date:') and current_question:
-                date_str = line.replace('Date:', '').strip()
+            if line.startswith(DATE_PREFIX) and current_question:
+                date_str = line[len(DATE_PREFIX):].strip()
                 current_question['givenAnswer']['answeredDate'] = date_str if date_str else None
                 i += 1
                 continue
@@ -167,7 +153,7 @@ def parse_html_file(file_path):
             # Detect comments
             if line == 'Comments' and current_question:
                 i += 1
-                if i < len(lines) and lines[i] not in ['Data Location:', 'Answered by:']:
+                if i < len(lines) and lines[i] not in COMMENTS_END_LINES:
                     current_question['givenAnswer']['comments'] = lines[i]
                     i += 1
                 continue
@@ -200,73 +186,9 @@ def parse_html_file(file_path):
         return None
 
 def main():
-    print('Starting Ford Survey HTML parsing...\n')
-    print(f'Looking for files in: {UPLOAD_DIR}\n')
-
-    # Check if upload directory exists
-    if not UPLOAD_DIR.exists():
-        print(f'ERROR: Upload directory not found: {UPLOAD_DIR}')
-        print('\nPlease create the directory and add your Section HTML files there.')
-        return
-
-    sections = []
-
-    for file_name in SECTION_FILES:
-        file_path = UPLOAD_DIR / file_name
-
-        if not file_path.exists():
-            print(f'File not found: {file_path}')
-            continue
-
-        print(f'Parsing {file_name}...')
-        section = parse_html_file(file_path)
-
-        if section:
-            sections.append(section)
-            answered_count = sum(1 for q in section['questions']
-                               if q['givenAnswer']['selectedOption'] or
-                                  q['givenAnswer']['comments'] or
-                                  q['givenAnswer']['answeredBy'])
-            print(f"  OK Extracted {len(section['questions'])} questions ({answered_count} answered)")
-        else:
-            print(f'  X Failed to parse {file_name}')
-
-    if not sections:
-        print('\nERROR: No sections were parsed successfully!')
-        return
-
-    # Sort sections by ID
-    sections.sort(key=lambda x: x['sectionId'])
-
-    # Create survey object
-    survey = {
-        'surveyId': 'ford-sig-lite-2024',
-        'surveyName': 'Ford SIG Lite 2024',
-        'surveyDescription': 'Standardized Information Gathering (SIG) Lite questionnaire for cybersecurity assessment',
-        'createdDate': datetime.now().strftime('%Y-%m-%d'),
-        'sections': sections
-    }
-
-    # Ensure output directory exists
-    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
-
-    # Write to file
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(survey, f, indent=2, ensure_ascii=False)
-
-    total_questions = sum(len(s['questions']) for s in sections)
-    print(f'\nOK Successfully parsed {len(sections)} sections')
-    print(f'OK Total questions: {total_questions}')
-    print(f'OK Output saved to: {OUTPUT_FILE}\n')
-
-    # Display summary
-    print('Summary by section:')
-    for section in sections:
-        answered_count = sum(1 for q in section['questions']
-                           if q['givenAnswer']['selectedOption'] or
-                              q['givenAnswer']['comments'] or
-                              q['givenAnswer']['answeredBy'])
-        print(f"  Section {section['sectionId']}: {len(section['questions'])} questions ({answered_count} answered)")
+    run(parse_html_file,
+        'Parse the Ford SIG Lite 2024 section HTML files to JSON',
+        'Starting Ford Survey HTML parsing...')
 
 if __name__ == '__main__':
     main()
@@ -1,10 +1,25 @@
+import argparse
+import glob
 import json
-import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from bs4 import BeautifulSoup, NavigableString
 from datetime import datetime
 
+try:
+    from lxml import etree
+except ImportError:
+    from bs4 import BeautifulSoup, SoupStrainer
+    etree = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configuration
 UPLOAD_DIR = Path(__file__).parent.parent.parent / 'uploads'
 OUTPUT_FILE = Path(__file__).parent.parent / 'data' / 'ford-survey-parsed.json'
@@ -27,45 +42,126 @@ SECTION_FILES = [
     'Section V.htm'
 ]
 
-def extract_text_preserving_structure(element):
-    """Extract text from HTML element preserving some structure"""
-    if element is None:
-        return []
-
-    text_blocks = []
-    for item in element.descendants:
-        if isinstance(item, NavigableString):
-            text = str(item).strip()
-            if text and text not in text_blocks:
-                text_blocks.append(text)
-    return text_blocks
+TITLE_PATTERN = re.compile(r'Section ([A-Z]):\s*(.+?)\s*-\s*\((.+?)\)')
+TITLE_DASH_PATTERN = re.compile(r'Section ([A-Z])\s*-\s*(.+?)\s*-\s*\((.+?)\)')
+TITLE_NO_RISK_PATTERN = re.compile(r'Section ([A-Z])[:\s-]+(.+)')
+TRAILING_PARENS_PATTERN = re.compile(r'\s*-\s*\(.+?\)\s*$')
+ANSWERED_BY_PATTERN = re.compile(r'Answered by:\s*([^0-9\n]+)')
+DATE_PATTERN = re.compile(r'(\d{2}/\d{2}/\d{4})')
+BODY_TAG_PATTERN = re.compile(rb'<body[\s/>]', re.IGNORECASE)
+
+# Marker lines that end each block of a question
+QUESTION_STOP_LINES = frozenset({'Help Text', 'Comments', 'Data Location:', 'Show possible answers'})
+OPTIONS_END_LINES = frozenset({'Show possible answers', 'Answered by:', 'Date:', 'Comments', 'Data Location:'})
+COMMENTS_END_LINES = frozenset({'Data Location:', 'Terms of Use'})
+
+class SectionTextTarget:
+    """lxml parser target that streams a Section page into its <h1> title and body text"""
+
+    # Text inside these tags is never part of the page text
+    SKIPPED_TAGS = ('head', 'script', 'style', 'template')
+
+    def __init__(self):
+        self.title_parts = None
+        self.text_parts = []
+        self._pending = []
+        self._skip_depth = 0
+        self._title_depth = 0
+
+    def _flush(self):
+        # Consecutive data events are one text node; tags and comments end it,
+        # so each node lands on its own line as with get_text(separator='\n')
+        if not self._pending:
+            return
+        text = ''.join(self._pending)
+        self._pending.clear()
+        self.text_parts.append(text)
+        if self._title_depth:
+            self.title_parts.append(text.strip())
+
+    def start(self, tag, attrib):
+        self._flush()
+        if tag == 'body':
+            # <body> implicitly closes an unterminated <head>
+            self._skip_depth = 0
+        elif tag in self.SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == 'h1':
+            # Only the first heading (with anything nested in it) is the section title
+            if self.title_parts is None:
+                self.title_parts = []
+                self._title_depth = 1
+            elif self._title_depth:
+                self._title_depth += 1
+
+    def end(self, tag):
+        self._flush()
+        if tag in self.SKIPPED_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag == 'h1' and self._title_depth:
+            self._title_depth -= 1
+
+    def data(self, data):
+        if not self._skip_depth:
+            self._pending.append(data)
+
+    def comment(self, text):
+        self._flush()
+
+    def close(self):
+        self._flush()
+        title_text = None if self.title_parts is None else ''.join(self.title_parts)
+        return title_text, '\n'.join(self.text_parts)
+
+def read_section_text(html):
+    """Return the (title, body text) of a Section page; the title is None when there is no <h1>"""
+    if etree is None:
+        # html.parser does not infer a <body>, so only strain pages that have one
+        strainer = SoupStrainer(['h1', 'body']) if BODY_TAG_PATTERN.search(html) else None
+        soup = BeautifulSoup(html, 'html.parser', parse_only=strainer, from_encoding='utf-8')
+        h1 = soup.find('h1')
+        return (h1.get_text(strip=True) if h1 else None), soup.get_text(separator='\n')
+
+    parser = etree.HTMLParser(target=SectionTextTarget(), encoding='utf-8')
+    parser.feed(html)
+    return parser.close()
+
+def index_question_lines(pattern, lines):
+    """Map line index -> match for every line a MULTILINE pattern matches, in one scan"""
+    text = '\n'.join(lines)
+    matches = {}
+    line_index = 0
+    position = 0
+    for match in pattern.finditer(text):
+        line_index += text.count('\n', position, match.start())
+        position = match.start()
+        matches[line_index] = match
+    return matches
+
+@lru_cache(maxsize=None)
+def question_line_pattern(section_id):
+    """MULTILINE pattern for "X.N question text" lines of a section, compiled once per letter"""
+    return re.compile(rf'^.*?{re.escape(section_id)}\.(\d+)[^\S\n]+(.+)$', re.MULTILINE)
 
 def parse_html_file(file_path):
     """Parse a single HTML file and extract section data"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            html = f.read()
-
-        soup = BeautifulSoup(html, 'html.parser')
-
-        # Extract section title from h1
-        h1 = soup.find('h1')
-        if not h1:
+        # Extract section title from h1 and the body text in one streaming parse
+        title_text, body_text = read_section_text(file_path.read_bytes())
+        if title_text is None:
             print(f"  X No h1 tag found in {file_path}")
             return None
 
-        title_text = h1.get_text(strip=True)
-
         # Parse title
-        match = re.search(r'Section ([A-Z]):\s*(.+?)\s*-\s*\((.+?)\)', title_text)
+        match = TITLE_PATTERN.search(title_text)
         if not match:
-            match = re.search(r'Section ([A-Z])\s*-\s*(.+?)\s*-\s*\((.+?)\)', title_text)
+            match = TITLE_DASH_PATTERN.search(title_text)
         if not match:
-            match = re.search(r'Section ([A-Z])[:\s-]+(.+)', title_text)
+            match = TITLE_NO_RISK_PATTERN.search(title_text)
             if match:
                 section_id = match.group(1)
                 section_name = match.group(2).strip()
-                section_name = re.sub(r'\s*-\s*\(.+?\)\s*$', '', section_name)
+                section_name = TRAILING_PARENS_PATTERN.sub('', section_name)
                 risk_level = None
             else:
                 print(f"  X Could not parse title: {title_text}")
@@ -78,25 +174,18 @@ def parse_html_file(file_path):
         # Find questions using a more robust approach
         questions = []
 
-        # Get full body text with better preservation
-        body_text = soup.get_text(separator='\n')
-
         # Split into lines and clean
-        all_lines = []
-        for line in body_text.split('\n'):
-            stripped = line.strip()
-            if stripped:
-                all_lines.append(stripped)
+        all_lines = [line for line in map(str.strip, body_text.split('\n')) if line]
 
         # Find question patterns: lines that contain "X.N" where X is section letter
-        question_pattern = re.compile(rf'^.*?{section_id}\.(\d+)\s+(.+)$')
+        question_id_lines = index_question_lines(question_line_pattern(section_id), all_lines)
 
         i = 0
         while i < len(all_lines):
             line = all_lines[i]
 
             # Check if this line contains a question ID
-            q_match = question_pattern.match(line)
+            q_match = question_id_lines.get(i)
             if q_match:
                 question_num = q_match.group(1)
                 question_id = f"{section_id}.{question_num}"
@@ -119,7 +208,7 @@ def parse_html_file(file_path):
                     next_line = all_lines[j]
 
                     # Stop if we hit another question
-                    if question_pattern.match(next_line):
+                    if j in question_id_lines:
                         break
 
                     # Check for Help Text
@@ -144,11 +233,11 @@ def parse_html_file(file_path):
                     # Collect options
                     if collecting_options:
                         # Options usually start with Yes/No or specific patterns
-                        if next_line.startswith('Yes,') or next_line.startswith('No,'):
+                        if next_line.startswith(('Yes,', 'No,')):
                             options.append(next_line)
                         elif next_line == 'Not applicable':
                             options.append(next_line)
-                        elif next_line in ['Show possible answers', 'Answered by:', 'Date:', 'Comments', 'Data Location:']:
+                        elif next_line in OPTIONS_END_LINES:
                             collecting_options = False
                         j += 1
                         continue
@@ -157,15 +246,15 @@ def parse_html_file(file_path):
                     if 'Answered by:' in next_line:
                         collecting_question = False
                         # Extract name after "Answered by:"
-                        answered_match = re.search(r'Answered by:\s*([^0-9\n]+)', next_line)
+                        answered_match = ANSWERED_BY_PATTERN.search(next_line)
                         if answered_match:
                             answered_by = answered_match.group(1).strip()
                         j += 1
                         continue
 
-                    # Check for date
-                    if 'Date:' in next_line or re.search(r'\d{2}/\d{2}/\d{4}', next_line):
-                        date_match = re.search(r'(\d{2}/\d{2}/\d{4})', next_line)
+                    # Check for date; a date needs a '/', so most lines skip the regex
+                    date_match = DATE_PATTERN.search(next_line) if '/' in next_line else None
+                    if 'Date:' in next_line or date_match:
                         if date_match:
                             answered_date = date_match.group(1)
                         j += 1
@@ -175,7 +264,7 @@ def parse_html_file(file_path):
                     if next_line == 'Comments':
                         if j + 1 < len(all_lines):
                             potential_comment = all_lines[j + 1]
-                            if potential_comment not in ['Data Location:', 'Terms of Use']:
+                            if potential_comment not in COMMENTS_END_LINES:
                                 comments = potential_comment
                                 j += 1
                         j += 1
@@ -188,7 +277,7 @@ def parse_html_file(file_path):
                     # Collect question text
                     if collecting_question:
                         # Skip certain metadata lines
-                        if next_line not in ['Help Text', 'Comments', 'Data Location:', 'Show possible answers']:
+                        if next_line not in QUESTION_STOP_LINES:
                             # Check if line ends a question (ends with ?)
                             if '?' in next_line:
                                 question_text_lines.append(next_line)
@@ -240,16 +329,85 @@ def parse_html_file(file_path):
         traceback.print_exc()
         return None
 
-def main():
-    print('Starting Ford Survey HTML parsing (Improved)...\n')
+def write_survey(survey, compact=False):
+    """Write the survey JSON, using orjson when it is installed"""
+    if orjson is not None:
+        option = 0 if compact else orjson.OPT_INDENT_2
+        OUTPUT_FILE.write_bytes(orjson.dumps(survey, option=option))
+        return
+
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        if compact:
+            json.dump(survey, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump(survey, f, indent=2, ensure_ascii=False)
+
+def section_cache_file(cache_dir, parser_name, file_path, code_version):
+    """Cache file for one parse of file_path, keyed by its mtime and size and the parser code version"""
+    stat = file_path.stat()
+    return cache_dir / f'{parser_name}.{file_path.stem}.{stat.st_mtime_ns}-{stat.st_size}-{code_version}.json'
+
+def load_cached_section(cache_file):
+    """Return a cached section parse, or None when there is no usable cache entry"""
+    try:
+        if orjson is not None:
+            return orjson.loads(cache_file.read_bytes())
+        return json.loads(cache_file.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+def store_cached_section(cache_file, section):
+    """Save a section parse, removing the stale entries for the same file and parser"""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        prefix = cache_file.name.rsplit('.', 2)[0]
+        for stale in cache_file.parent.glob(f'{glob.escape(prefix)}.*.json'):
+            stale.unlink(missing_ok=True)
+
+        if orjson is not None:
+            cache_file.write_bytes(orjson.dumps(section))
+        else:
+            cache_file.write_text(json.dumps(section, ensure_ascii=False), encoding='utf-8')
+    except OSError:
+        # The cache only saves time; an unwritable cache directory is not an error
+        pass
+
+def count_answered(questions):
+    """Number of questions with a selected option, comments or an answerer"""
+    answered = 0
+    for q in questions:
+        ga = q['givenAnswer']
+        if ga['selectedOption'] or ga['comments'] or ga['answeredBy']:
+            answered += 1
+    return answered
+
+def run(parse_fn, description, banner):
+    """Parse every section file with parse_fn and write the survey JSON"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--compact', action='store_true',
+                        help='write compact JSON instead of indenting it')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='re-parse every section file instead of reusing cached parses')
+    args = parser.parse_args()
+
+    print(f'{banner}\n')
     print(f'Looking for files in: {UPLOAD_DIR}\n')
 
     if not UPLOAD_DIR.exists():
         print(f'ERROR: Upload directory not found: {UPLOAD_DIR}')
+        print('\nPlease create the directory and add your Section HTML files there.')
         return
 
-    sections = []
+    # (sectionId, section, answered question count), so each section is counted once
+    # and the list sorts on the id alone
+    parsed = []
+
+    # Parses are cached per section file; editing the parser invalidates them too
+    cache_dir = OUTPUT_FILE.parent / '.cache'
+    parser_file = Path(parse_fn.__code__.co_filename)
+    code_version = max(parser_file.stat().st_mtime_ns, Path(__file__).stat().st_mtime_ns)
 
+    pending = []
     for file_name in SECTION_FILES:
         file_path = UPLOAD_DIR / file_name
 
@@ -257,24 +415,42 @@ def main():
             print(f'File not found: {file_path}')
             continue
 
-        print(f'Parsing {file_name}...')
-        section = parse_html_file(file_path)
-
-        if section:
-            sections.append(section)
-            answered_count = sum(1 for q in section['questions']
-                               if q['givenAnswer']['selectedOption'] or
-                                  q['givenAnswer']['comments'] or
-                                  q['givenAnswer']['answeredBy'])
-            print(f"  OK Extracted {len(section['questions'])} questions ({answered_count} answered)")
-        else:
-            print(f'  X Failed to parse {file_name}')
+        cache_file = section_cache_file(cache_dir, parser_file.stem, file_path, code_version)
+        cached = None if args.no_cache else load_cached_section(cache_file)
+        pending.append((file_name, file_path, cache_file, cached))
+
+    # Section files are independent and CPU-bound, so parse them across processes.
+    # Starting the workers is most of a fully cached run, so skip the pool then.
+    to_parse = [file_path for _, file_path, _, cached in pending if cached is None]
+    with ExitStack() as stack:
+        results = iter(())
+        if to_parse:
+            executor = stack.enter_context(ProcessPoolExecutor())
+            results = executor.map(parse_fn, to_parse)
+
+        for file_name, _, cache_file, cached in pending:
+            if cached is not None:
+                print(f'Parsing {file_name}... (cached)')
+                section = cached
+            else:
+                print(f'Parsing {file_name}...')
+                section = next(results)
+                if section:
+                    store_cached_section(cache_file, section)
+
+            if section:
+                answered_count = count_answered(section['questions'])
+                parsed.append((section['sectionId'], section, answered_count))
+                print(f"  OK Extracted {len(section['questions'])} questions ({answered_count} answered)")
+            else:
+                print(f'  X Failed to parse {file_name}')
 
-    if not sections:
+    if not parsed:
         print('\nERROR: No sections were parsed successfully!')
         return
 
-    sections.sort(key=lambda x: x['sectionId'])
+    parsed.sort(key=itemgetter(0))
+    sections = [section for _, section, _ in parsed]
 
     survey = {
         'surveyId': 'ford-sig-lite-2024',
@@ -286,8 +462,7 @@ def main():
 
     OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(survey, f, indent=2, ensure_ascii=False)
+    write_survey(survey, compact=args.compact)
 
     total_questions = sum(len(s['questions']) for s in sections)
     print(f'\nOK Successfully parsed {len(sections)} sections')
@@ -295,12 +470,13 @@ def main():
     print(f'OK Output saved to: {OUTPUT_FILE}\n')
 
     print('Summary by section:')
-    for section in sections:
-        answered_count = sum(1 for q in section['questions']
-                           if q['givenAnswer']['selectedOption'] or
-                              q['givenAnswer']['comments'] or
-                              q['givenAnswer']['answeredBy'])
+    for _, section, answered_count in parsed:
         print(f"  Section {section['sectionId']}: {len(section['questions'])} questions ({answered_count} answered)")
 
+def main():
+    run(parse_html_file,
+        'Parse the Ford SIG Lite 2024 section HTML files to JSON (improved parser)',
+        'Starting Ford Survey HTML parsing (Improved)...')
+
 if __name__ == '__main__':
     main()